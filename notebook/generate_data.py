@@ -4,126 +4,246 @@ This mirrors the notebook logic but runs as a standalone script.
 """
 import os
 import re
-import json
+import string
 import sys
+import orjson
 import requests
+import urllib3
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from lxml import etree
 from bs4 import BeautifulSoup
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.metrics.pairwise import linear_kernel
 from collections import Counter
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 
 FEED_URL = 'https://www.workable.com/boards/workable.xml'
 XML_PATH = 'data/workable_feed.xml'
 OUTPUT_DIR = 'output'
 SAMPLE_SIZE = 1000
 TOP_N = 3
+SIM_BLOCK_ROWS = 256
+CLEAN_CHUNKSIZE = 32
+PARSE_CLEAR_EVERY = 1000
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+PROGRESS_EVERY_BYTES = 5 * 1024 * 1024
+
+FILL_VALUES = {
+    'category': 'Other', 'experience': 'Not Specified', 'education': 'Not Specified',
+    'job_type': 'Not Specified',
+}
+# Filled only after sampling: dedup keys on the raw city, where a blank must not
+# match a job whose city is literally 'Unknown'
+LOCATION_FILL_VALUES = {'city': 'Unknown', 'state': 'Unknown', 'country': 'Unknown'}
+
+URL_RE = re.compile(r'http\S+|www\.\S+')
+EMAIL_RE = re.compile(r'\S+@\S+\.\S+')
+ENTITY_RE = re.compile(r'&\w+;')
+ASCII_ALNUM = frozenset(string.ascii_lowercase + string.digits)
+WHITESPACE_RE = re.compile(r'\s+')
 
 os.makedirs('data', exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
-def download_feed():
+class TeeReader:
+    """File-like wrapper that copies every chunk read from `stream` into `sink`.
+
+    Prints download progress every PROGRESS_EVERY_BYTES, as a share of `total`
+    bytes when the size is known.
+    """
+
+    def __init__(self, stream, sink, total=0):
+        self.stream = stream
+        self.sink = sink
+        self.total = total
+        self.bytes_read = 0
+        self.last_report = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.sink.write(data)
+        self.bytes_read += len(data)
+        if self.bytes_read - self.last_report >= PROGRESS_EVERY_BYTES:
+            self.last_report = self.bytes_read
+            downloaded_mb = self.bytes_read / 1024 / 1024
+            if self.total > 0:
+                print(f'  Downloaded {downloaded_mb:.1f} MB ({self.bytes_read / self.total * 100:.0f}%)', flush=True)
+            else:
+                print(f'  Downloaded {downloaded_mb:.1f} MB', flush=True)
+        return data
+
+
+def load_feed():
     if os.path.exists(XML_PATH):
         size_mb = os.path.getsize(XML_PATH) / (1024 * 1024)
         print(f'XML feed already cached ({size_mb:.1f} MB). Skipping download.')
-        return True
-
-    print(f'Downloading XML feed from {FEED_URL}...')
+        return parse_feed(XML_PATH)
+
+    # Parse straight off the network so parsing overlaps the download, and
+    # cache the raw bytes as they pass through instead of re-reading them
+    print(f'Downloading and parsing XML feed from {FEED_URL}...')
+    part_path = XML_PATH + '.part'
+    # Parsing pulls bytes off the network, so transfer errors surface from inside
+    # parse_feed; the except clauses tell them apart from parse failures by type
     try:
         response = requests.get(FEED_URL, stream=True, timeout=600)
         response.raise_for_status()
+        response.raw.decode_content = True
         total = int(response.headers.get('content-length', 0))
-        downloaded = 0
-        with open(XML_PATH, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=65536):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total > 0:
-                    pct = downloaded / total * 100
-                    print(f'\rDownloaded {downloaded / 1024 / 1024:.1f} MB ({pct:.0f}%)', end='', flush=True)
-                else:
-                    print(f'\rDownloaded {downloaded / 1024 / 1024:.1f} MB', end='', flush=True)
-        print(f'\nDone! Saved to {XML_PATH}')
-        return True
-    except Exception as e:
+        with open(part_path, 'wb') as f:
+            tee = TeeReader(response.raw, f, total)
+            jobs = parse_feed(tee)
+            # Drain anything the parser left unread so the cached copy is complete
+            while tee.read(DOWNLOAD_CHUNK_BYTES):
+                pass
+        os.replace(part_path, XML_PATH)
+        print(f'Done! Saved {tee.bytes_read / 1024 / 1024:.1f} MB to {XML_PATH}')
+        return jobs
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
         print(f'\nDownload failed: {e}')
-        return False
-
-
-def parse_feed(max_jobs=None):
+        return None
+    except Exception as e:
+        print(f'\nParsing feed failed: {e}')
+        return None
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def iter_feed(source):
+    """Yield (position, {tag: text}) for every <job>, freeing parsed elements as it goes.
+
+    A path is opened here so that closing the generator early also closes the file.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from iter_feed(f)
+        return
+
+    context = etree.iterparse(
+        source, events=('end',), tag='job', recover=True,
+        huge_tree=True, collect_ids=False,
+    )
+    root = None
+
+    for pos, (event, elem) in enumerate(context):
+        # One pass over the children instead of a findtext() scan per field
+        fields = {}
+        for child in elem:
+            if child.tag not in fields:
+                fields[child.tag] = (child.text or '').strip()
+        yield pos, fields
+
+        # Free memory: empty this job now, and periodically drop the emptied
+        # <job> shells from the root rather than rescanning siblings every event
+        elem.clear(keep_tail=False)
+        if root is None:
+            root = elem.getroottree().getroot()
+        if (pos + 1) % PARSE_CLEAR_EVERY == 0:
+            root.clear()
+
+
+def parse_feed(source, max_jobs=None):
+    # Descriptions dominate the feed's size but only the sampled jobs need them,
+    # so this pass keeps just the light fields; see parse_descriptions()
     print('Parsing XML feed...')
     jobs = []
-    context = etree.iterparse(XML_PATH, events=('end',), tag='job', recover=True)
-
-    for event, elem in context:
-        job = {
-            'id': (elem.findtext('referencenumber') or '').strip(),
-            'title': (elem.findtext('title') or '').strip(),
-            'company': (elem.findtext('company') or '').strip(),
-            'city': (elem.findtext('city') or '').strip(),
-            'state': (elem.findtext('state') or '').strip(),
-            'country': (elem.findtext('country') or '').strip(),
-            'remote': (elem.findtext('remote') or '').strip().lower() == 'true',
-            'description': (elem.findtext('description') or '').strip(),
-            'education': (elem.findtext('education') or '').strip(),
-            'job_type': (elem.findtext('jobtype') or '').strip(),
-            'category': (elem.findtext('category') or '').strip(),
-            'experience': (elem.findtext('experience') or '').strip(),
-            'url': (elem.findtext('url') or '').strip(),
-            'date': (elem.findtext('date') or '').strip(),
-        }
-
-        if job['id'] and job['title'] and job['description']:
-            jobs.append(job)
-
-        elem.clear()
-        while elem.getprevious() is not None:
-            del elem.getparent()[0]
-
-        if max_jobs and len(jobs) >= max_jobs:
-            break
-
-        if len(jobs) % 10000 == 0 and len(jobs) > 0:
-            print(f'  Parsed {len(jobs):,} jobs...', flush=True)
+
+    with closing(iter_feed(source)) as feed:
+        for pos, fields in feed:
+            job = {
+                'feed_pos': pos,
+                'id': fields.get('referencenumber', ''),
+                'title': fields.get('title', ''),
+                'company': fields.get('company', ''),
+                'city': fields.get('city', ''),
+                'state': fields.get('state', ''),
+                'country': fields.get('country', ''),
+                'remote': fields.get('remote', '').lower() == 'true',
+                'education': fields.get('education', ''),
+                'job_type': fields.get('jobtype', ''),
+                'category': fields.get('category', ''),
+                'experience': fields.get('experience', ''),
+                'url': fields.get('url', ''),
+                'date': fields.get('date', ''),
+            }
+
+            if job['id'] and job['title'] and fields.get('description'):
+                jobs.append(job)
+
+            if max_jobs and len(jobs) >= max_jobs:
+                break
+
+            if len(jobs) % 10000 == 0 and len(jobs) > 0:
+                print(f'  Parsed {len(jobs):,} jobs...', flush=True)
 
     print(f'Parsed {len(jobs):,} valid jobs.')
     return jobs
 
 
+def parse_descriptions(source, positions):
+    """Second pass over the feed, returning {position: description} for `positions` only."""
+    wanted = set(positions)
+    if not wanted:
+        return {}
+    last = max(wanted)
+    descriptions = {}
+    # Stopping early would leave the parser and its file open until garbage
+    # collection; closing the generator releases both right away
+    with closing(iter_feed(source)) as feed:
+        for pos, fields in feed:
+            if pos in wanted:
+                descriptions[pos] = fields.get('description', '')
+            if pos >= last:
+                break
+    return descriptions
+
+
 def clean_html(raw_html):
-    if not raw_html or not isinstance(raw_html, str):
-        return ''
-    soup = BeautifulSoup(raw_html, 'html.parser')
+    # Expects a str; main() normalizes the column once rather than checking every row
+    soup = BeautifulSoup(raw_html, 'lxml')
     for tag in soup.find_all(['script', 'style']):
         tag.decompose()
     text = soup.get_text(separator=' ', strip=True)
-    text = re.sub(r'http\S+|www\.\S+', '', text)
-    text = re.sub(r'\S+@\S+\.\S+', '', text)
-    text = re.sub(r'&\w+;', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = URL_RE.sub('', text)
+    text = EMAIL_RE.sub('', text)
+    text = ENTITY_RE.sub(' ', text)
+    text = WHITESPACE_RE.sub(' ', text).strip()
     return text
 
 
+class AlnumTable(dict):
+    """str.translate table that lowercases, keeps a-z/0-9 and maps the rest to spaces.
+
+    Entries are filled lazily so any character, ASCII or not, gets exactly what
+    lower() followed by a [^a-z0-9] -> ' ' substitution would give it.
+    """
+
+    def __missing__(self, code):
+        mapped = ''.join(c if c in ASCII_ALNUM else ' ' for c in chr(code).lower())
+        self[code] = mapped
+        return mapped
+
+
+PREPROCESS_TABLE = AlnumTable()
+
+
 def preprocess_text(text):
-    if not text:
-        return ''
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # One C-level translate pass, then split/join collapses and strips whitespace
+    return ' '.join(text.translate(PREPROCESS_TABLE).split())
 
 
 def stratified_sample(df, n=1000, min_per_group=5):
     df_dedup = df.drop_duplicates(subset=['title', 'company', 'city'])
     print(f'After dedup: {len(df_dedup):,} (removed {len(df) - len(df_dedup):,} duplicates)')
 
-    df_dedup = df_dedup.copy()
-    df_dedup['category'] = df_dedup['category'].replace('', 'Other')
-
-    cat_counts = df_dedup['category'].value_counts()
+    # Count on plain strings: categorical value_counts breaks count ties by
+    # category order, object dtype by first appearance, which fixes row order
+    cat_counts = df_dedup['category'].astype(object).value_counts()
     cat_proportions = cat_counts / cat_counts.sum()
     cat_samples = (cat_proportions * n).apply(lambda x: max(int(x), min_per_group))
 
@@ -134,60 +254,100 @@ def stratified_sample(df, n=1000, min_per_group=5):
         largest = cat_samples.idxmax()
         cat_samples[largest] += 1
 
+    # Draw row positions per category from the groupby index, then take all
+    # sampled rows in one go instead of masking and copying each category.
+    # A fresh RandomState(42) per group matches DataFrame.sample(random_state=42).
+    group_positions = df_dedup.groupby('category', observed=True, sort=False).indices
     sampled = []
     for cat, count in cat_samples.items():
-        cat_df = df_dedup[df_dedup['category'] == cat]
-        sample_n = min(count, len(cat_df))
-        sampled.append(cat_df.sample(n=sample_n, random_state=42))
+        positions = group_positions[cat]
+        sample_n = min(count, len(positions))
+        rng = np.random.RandomState(42)
+        sampled.append(positions[rng.choice(len(positions), size=sample_n, replace=False)])
 
-    result = pd.concat(sampled).reset_index(drop=True)
+    result = df_dedup.iloc[np.concatenate(sampled)].reset_index(drop=True)
     print(f'Sampled {len(result)} jobs across {result["category"].nunique()} categories')
     return result
 
 
-def get_top_n_recs(sim_matrix, df, n=3):
-    recs = {}
-    for i in range(len(df)):
-        scores = sim_matrix[i].copy()
-        scores[i] = -1
-        top_n = np.argsort(scores)[::-1][:n]
-        recs[df.iloc[i]['id']] = [
-            {'id': df.iloc[top_n[j]]['id'], 'score': round(float(scores[top_n[j]]), 4)}
-            for j in range(n)
+def category_codes(values):
+    return pd.Categorical(values).codes.astype(np.int32)
+
+
+def top_n_indices(sim_block, n_rows, n=3, block_rows=SIM_BLOCK_ROWS):
+    """Top-N neighbour rows per job, scoring `block_rows` source jobs at a time.
+
+    `sim_block(start, stop)` returns the similarity of jobs start:stop against
+    every job, so peak memory is block_rows x N instead of a full N x N matrix.
+    Returns (n_rows, n) arrays of neighbour row indices and their scores, best first.
+    """
+    top_idx = np.empty((n_rows, n), dtype=np.intp)
+    top_val = np.empty((n_rows, n), dtype=np.float32)
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        # Row-wise selection below wants row-major float32; a no-op when already so
+        block = np.ascontiguousarray(sim_block(start, stop), dtype=np.float32)
+        # Exclude self-matches; each block is a fresh array, so writing to it is safe
+        block[np.arange(stop - start), np.arange(start, stop)] = -1
+
+        # Partial top-n selection per row, then sort only those n candidates
+        top_n = np.argpartition(block, -n, axis=1)[:, -n:]
+        top_scores = np.take_along_axis(block, top_n, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_idx[start:stop] = np.take_along_axis(top_n, order, axis=1)
+        top_val[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return top_idx, top_val
+
+
+def recs_to_dict(top_idx, top_scores, ids):
+    """Export layout {job_id: [{'id': rec_id, 'score': score}, ...]} for top_n_indices output."""
+    # Convert to Python objects in one go rather than boxing every numpy scalar
+    # separately inside the dict-building loop
+    rows = zip(ids.tolist(), ids[top_idx].tolist(), top_scores.tolist())
+    return {
+        job_id: [
+            {'id': rec_id, 'score': round(score, 4)}
+            for rec_id, score in zip(rec_ids, rec_scores)
         ]
-    return recs
+        for job_id, rec_ids, rec_scores in rows
+    }
 
 
 def main():
-    # Step 1: Download
-    if not download_feed():
+    # Step 1-2: Download and parse
+    all_jobs = load_feed()
+    if all_jobs is None:
         print('Cannot proceed without XML feed.')
         sys.exit(1)
 
-    # Step 2: Parse
-    all_jobs = parse_feed()
-
     # Step 3: Load and sample
     df_all = pd.DataFrame(all_jobs)
+
     print(f'\nDataFrame: {df_all.shape[0]:,} jobs, {df_all.shape[1]} columns')
     print(f'Categories: {df_all["category"].nunique()}')
 
+    # Fill missing, then store the low-cardinality columns as categoricals so
+    # grouping, value_counts and equality checks work on integer codes
+    for col, fill in FILL_VALUES.items():
+        df_all[col] = df_all[col].replace('', fill).astype('category')
+
     df = stratified_sample(df_all, n=SAMPLE_SIZE)
+    for col, fill in LOCATION_FILL_VALUES.items():
+        df[col] = df[col].replace('', fill).astype('category')
+
+    print(f'\nLoading descriptions for {len(df)} sampled jobs...')
+    description_by_pos = parse_descriptions(XML_PATH, df['feed_pos'])
+    df['description'] = df['feed_pos'].map(description_by_pos)
 
     # Step 4: Clean and preprocess
+    # HTML parsing and regex cleanup are CPU-bound per row, so fan out across cores
     print('\nCleaning HTML descriptions...')
-    df['description_clean'] = df['description'].apply(clean_html)
-    df['title_clean'] = df['title'].apply(preprocess_text)
-    df['desc_processed'] = df['description_clean'].apply(preprocess_text)
-
-    # Fill missing
-    df['category'] = df['category'].replace('', 'Other')
-    df['experience'] = df['experience'].replace('', 'Not Specified')
-    df['education'] = df['education'].replace('', 'Not Specified')
-    df['job_type'] = df['job_type'].replace('', 'Not Specified')
-    df['city'] = df['city'].replace('', 'Unknown')
-    df['state'] = df['state'].replace('', 'Unknown')
-    df['country'] = df['country'].replace('', 'Unknown')
+    raw_descriptions = df['description'].fillna('').astype(str).tolist()
+    titles = df['title'].fillna('').astype(str).tolist()
+    with ProcessPoolExecutor() as pool:
+        df['description_clean'] = list(pool.map(clean_html, raw_descriptions, chunksize=CLEAN_CHUNKSIZE))
+        df['title_clean'] = list(pool.map(preprocess_text, titles, chunksize=CLEAN_CHUNKSIZE))
+        df['desc_processed'] = list(pool.map(preprocess_text, df['description_clean'], chunksize=CLEAN_CHUNKSIZE))
 
     print(f'Description lengths: min={df["description_clean"].str.len().min()}, '
           f'median={df["description_clean"].str.len().median():.0f}, '
@@ -195,24 +355,34 @@ def main():
 
     # Step 5: Baseline model (title TF-IDF)
     print('\n--- Baseline Model (Title-Only Cosine Similarity) ---')
+    # norm='l2' (the default, spelled out) makes every row unit length, so a
+    # plain dot product via linear_kernel is the cosine similarity
     title_vectorizer = TfidfVectorizer(
         ngram_range=(1, 2), max_features=5000,
         stop_words='english', sublinear_tf=True,
+        norm='l2', dtype=np.float32,
     )
     title_tfidf = title_vectorizer.fit_transform(df['title_clean'])
     print(f'Title TF-IDF shape: {title_tfidf.shape}')
 
-    title_sim_matrix = cosine_similarity(title_tfidf)
-    baseline_recs = get_top_n_recs(title_sim_matrix, df, n=TOP_N)
+    def title_sim_block(start, stop):
+        return linear_kernel(title_tfidf[start:stop], title_tfidf)
+
+    baseline_top, baseline_scores = top_n_indices(title_sim_block, len(df), n=TOP_N)
+    baseline_recs = recs_to_dict(baseline_top, baseline_scores, df['id'].values)
     print(f'Baseline recs generated for {len(baseline_recs)} jobs.')
 
     # Spot check
+    # Repeated ids resolve to their first row, like the df[df['id'] == id].iloc[0] lookup did
+    row_by_id = {}
+    for k, job_id in enumerate(df['id'].values):
+        row_by_id.setdefault(job_id, k)
     for i in [0, 100, 500]:
         if i < len(df):
             job = df.iloc[i]
             print(f'\n  Source: {job["title"]} ({job["company"]})')
             for rec in baseline_recs[job['id']]:
-                r = df[df['id'] == rec['id']].iloc[0]
+                r = df.iloc[row_by_id[rec['id']]]
                 print(f'    -> {r["title"]} ({r["company"]}) score={rec["score"]:.4f}')
 
     # Step 6: Weighted model
@@ -221,53 +391,79 @@ def main():
         ngram_range=(1, 2), max_features=10000,
         max_df=0.85, min_df=2,
         stop_words='english', sublinear_tf=True,
-        dtype=np.float32,
+        norm='l2', dtype=np.float32,
     )
     desc_tfidf = desc_vectorizer.fit_transform(df['desc_processed'])
     print(f'Description TF-IDF shape: {desc_tfidf.shape}')
 
-    desc_sim = cosine_similarity(desc_tfidf)
-
-    categories = df['category'].values
-    cat_sim = (categories[:, None] == categories[None, :]).astype(np.float32)
-
-    cities = df['city'].values
-    states = df['state'].values
-    countries = df['country'].values
-    loc_sim = np.where(
-        cities[:, None] == cities[None, :], 1.0,
-        np.where(states[:, None] == states[None, :], 0.5,
-                 np.where(countries[:, None] == countries[None, :], 0.2, 0.0))
-    ).astype(np.float32)
-
-    jobtypes = df['job_type'].values
-    type_sim = (jobtypes[:, None] == jobtypes[None, :]).astype(np.float32)
+    # Dictionary-encode the categorical columns once so the per-block
+    # equality tests compare integers instead of Python strings
+    cat_codes = category_codes(df['category'])
+    city_codes = category_codes(df['city'])
+    state_codes = category_codes(df['state'])
+    country_codes = category_codes(df['country'])
+    type_codes = category_codes(df['job_type'])
 
     exp_map = {
         'Entry level': 0, 'Internship': 0, 'Associate': 1,
         'Mid-Senior level': 2, 'Not Specified': 2,
         'Director': 3, 'Executive': 4,
     }
-    exp_vals = np.array([exp_map.get(e, 2) for e in df['experience'].values], dtype=np.float32)
-    exp_dist = np.abs(exp_vals[:, None] - exp_vals[None, :])
-    max_dist = exp_dist.max()
-    exp_sim = (1.0 - exp_dist / max_dist).astype(np.float32) if max_dist > 0 else np.ones_like(exp_dist)
+    exp_levels = np.array([exp_map.get(e, 2) for e in df['experience'].values], dtype=np.int32)
+    max_dist = exp_levels.max() - exp_levels.min()
 
     WEIGHTS = {
         'description': 0.35, 'title': 0.25, 'category': 0.15,
         'location': 0.10, 'job_type': 0.08, 'experience': 0.07,
     }
 
-    weighted_sim = (
-        WEIGHTS['description'] * desc_sim +
-        WEIGHTS['title'] * title_sim_matrix.astype(np.float32) +
-        WEIGHTS['category'] * cat_sim +
-        WEIGHTS['location'] * loc_sim +
-        WEIGHTS['job_type'] * type_sim +
-        WEIGHTS['experience'] * exp_sim
+    # Category, job type and experience only take a handful of values, so score
+    # every distinct (category, job type, experience) profile against every other
+    # once; each block then needs a single gather instead of three features
+    profiles, profile_ids = np.unique(
+        np.stack([cat_codes, type_codes, exp_levels], axis=1), axis=0, return_inverse=True,
     )
-
-    weighted_recs = get_top_n_recs(weighted_sim, df, n=TOP_N)
+    profile_ids = profile_ids.ravel()
+    p_cat, p_type, p_exp = profiles.T
+    exp_dist = np.abs(p_exp[:, None] - p_exp[None, :])
+    exp_sim = 1.0 - exp_dist / max_dist if max_dist > 0 else np.ones(exp_dist.shape)
+    profile_sim = (
+        WEIGHTS['category'] * (p_cat[:, None] == p_cat[None, :]) +
+        WEIGHTS['job_type'] * (p_type[:, None] == p_type[None, :]) +
+        WEIGHTS['experience'] * exp_sim
+    ).astype(np.float32)
+    print(f'Categorical profiles: {len(profiles)}')
+
+    # Scaling each TF-IDF block by sqrt(weight) and stacking them side by side makes
+    # one dot product equal w_desc * desc_sim + w_title * title_sim
+    text_features = sparse.hstack([
+        desc_tfidf * np.sqrt(WEIGHTS['description']),
+        title_tfidf * np.sqrt(WEIGHTS['title']),
+    ], format='csr', dtype=np.float32)
+
+    def weighted_sim_block(start, stop):
+        rows = slice(start, stop)
+        weighted_sim = linear_kernel(text_features[rows], text_features)
+
+        # Accumulate the remaining features into the same float32 buffer, reusing
+        # a single scratch array rather than allocating a temporary per term
+        tmp = np.empty_like(weighted_sim)
+
+        # Tiered location: same city=1.0, else same state=0.5, else same country=0.2
+        tmp.fill(0.0)
+        np.copyto(tmp, 0.2, where=country_codes[rows, None] == country_codes[None, :])
+        np.copyto(tmp, 0.5, where=state_codes[rows, None] == state_codes[None, :])
+        np.copyto(tmp, 1.0, where=city_codes[rows, None] == city_codes[None, :])
+        tmp *= WEIGHTS['location']
+        weighted_sim += tmp
+
+        np.take(profile_sim[profile_ids[rows]], profile_ids, axis=1, out=tmp)
+        weighted_sim += tmp
+
+        return weighted_sim
+
+    weighted_top, weighted_scores = top_n_indices(weighted_sim_block, len(df), n=TOP_N)
+    weighted_recs = recs_to_dict(weighted_top, weighted_scores, df['id'].values)
     print(f'Weighted recs generated for {len(weighted_recs)} jobs.')
 
     # Spot check comparison
@@ -277,54 +473,42 @@ def main():
             print(f'\n  Source: {job["title"]} ({job["company"]})')
             print(f'    Baseline:')
             for rec in baseline_recs[job['id']]:
-                r = df[df['id'] == rec['id']].iloc[0]
+                r = df.iloc[row_by_id[rec['id']]]
                 print(f'      -> {r["title"]} score={rec["score"]:.4f}')
             print(f'    Weighted:')
             for rec in weighted_recs[job['id']]:
-                r = df[df['id'] == rec['id']].iloc[0]
+                r = df.iloc[row_by_id[rec['id']]]
                 print(f'      -> {r["title"]} score={rec["score"]:.4f}')
 
     # Overlap analysis
-    overlaps = []
-    for job_id in baseline_recs:
-        base_ids = {r['id'] for r in baseline_recs[job_id]}
-        wtd_ids = {r['id'] for r in weighted_recs[job_id]}
-        overlaps.append(len(base_ids & wtd_ids))
-    overlap_counts = Counter(overlaps)
-    print(f'\nOverlap: avg {np.mean(overlaps):.1f} shared recs per job')
+    # Both top-N index arrays are row-aligned, so compare every baseline pick with
+    # every weighted pick for all jobs in one broadcast
+    overlaps = (baseline_top[:, :, None] == weighted_top[:, None, :]).any(axis=2).sum(axis=1)
+    overlap_counts = Counter(overlaps.tolist())
+    print(f'\nOverlap: avg {overlaps.mean():.1f} shared recs per job')
     for k, v in sorted(overlap_counts.items()):
         print(f'  {k}/{TOP_N}: {v} jobs ({v/len(df)*100:.1f}%)')
 
     # Step 7: Export
     print('\n--- Exporting JSON ---')
-    jobs_export = []
-    for _, row in df.iterrows():
-        jobs_export.append({
-            'id': row['id'],
-            'title': row['title'],
-            'company': row['company'],
-            'city': row['city'],
-            'state': row['state'],
-            'country': row['country'],
-            'remote': bool(row['remote']),
-            'description': row['description'],
-            'category': row['category'],
-            'jobType': row['job_type'],
-            'experience': row['experience'],
-            'education': row['education'],
-            'url': row['url'],
-        })
+    export_cols = [
+        'id', 'title', 'company', 'city', 'state', 'country', 'remote', 'description',
+        'category', 'job_type', 'experience', 'education', 'url',
+    ]
+    export_df = df[export_cols].rename(columns={'job_type': 'jobType'})
+    export_df['remote'] = export_df['remote'].astype(bool)
+    jobs_export = export_df.to_dict(orient='records')
 
     jobs_path = os.path.join(OUTPUT_DIR, 'jobs.json')
     baseline_path = os.path.join(OUTPUT_DIR, 'recs_baseline.json')
     weighted_path = os.path.join(OUTPUT_DIR, 'recs_weighted.json')
 
-    with open(jobs_path, 'w') as f:
-        json.dump(jobs_export, f, separators=(',', ':'))
-    with open(baseline_path, 'w') as f:
-        json.dump(baseline_recs, f, separators=(',', ':'))
-    with open(weighted_path, 'w') as f:
-        json.dump(weighted_recs, f, separators=(',', ':'))
+    with open(jobs_path, 'wb') as f:
+        f.write(orjson.dumps(jobs_export))
+    with open(baseline_path, 'wb') as f:
+        f.write(orjson.dumps(baseline_recs))
+    with open(weighted_path, 'wb') as f:
+        f.write(orjson.dumps(weighted_recs))
 
     for path in [jobs_path, baseline_path, weighted_path]:
         size_kb = os.path.getsize(path) / 1024
@@ -332,7 +516,7 @@ def main():
         print(f'  {path}: {label}')
 
     # Sanity check
-    job_ids = {j['id'] for j in jobs_export}
+    job_ids = frozenset(j['id'] for j in jobs_export)
     for recs in [baseline_recs, weighted_recs]:
         for job_id, rec_list in recs.items():
             assert job_id in job_ids
@@ -4,14 +4,14 @@ Uses the Workable XML feed schema we already inspected.
 When the feed is available, the notebook will use real data.
 This generates realistic sample data for local web app development.
 """
-import json
 import os
-import random
 import re
+import orjson
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.metrics.pairwise import linear_kernel
 from collections import Counter
 
 OUTPUT_DIR = 'output'
@@ -19,6 +19,15 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 SAMPLE_SIZE = 1000
 TOP_N = 3
+SIM_BLOCK_ROWS = 256
+
+# Tags and entities are both replaced by a space, so one alternation strips them
+# in a single scan. Same result as stripping tags first: the tag branch is tried
+# first at every '<', so entities inside a tag (<a title="&amp;">) go with it,
+# and an entity can never contain '<'
+MARKUP_RE = re.compile(r'<[^>]+>|&\w+;')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+WHITESPACE_RE = re.compile(r'\s+')
 
 # Realistic job data pools
 CATEGORIES = [
@@ -178,6 +187,7 @@ CITIES = [
     ("Dublin", "", "IE"), ("Bangalore", "Karnataka", "IN"),
 ]
 
+TITLE_PREFIXES = ["Senior ", "Junior ", "Lead ", "Staff ", "Principal "]
 EXPERIENCE_LEVELS = ["Entry level", "Associate", "Mid-Senior level", "Director", "Executive"]
 JOB_TYPES = ["Full-time", "Part-time", "Contract", "Temporary", "Internship"]
 EDUCATION_LEVELS = ["High School or equivalent", "Associate's Degree", "Bachelor's Degree", "Master's Degree", "Doctorate"]
@@ -207,24 +217,33 @@ TEAMS = ["product managers, designers, and engineers", "a cross-functional agile
 DELIVERABLES = ["high-quality software products", "scalable and reliable systems", "innovative solutions for our customers", "data-driven insights and tools", "seamless user experiences"]
 REQUIREMENTS_GENERAL = ["excellent communication skills", "strong analytical and problem-solving abilities", "ability to work independently and in teams", "attention to detail and organizational skills", "proficiency in relevant software tools"]
 
+BENEFITS_HTML = """<h3>Benefits</h3>
+<ul>
+<li>Competitive salary and equity</li>
+<li>Health, dental, and vision insurance</li>
+<li>Flexible work arrangements</li>
+<li>Professional development budget</li>
+<li>"""
 
-def generate_description(title, company, category, city, job_type):
-    """Generate a realistic job description."""
-    templates = DESC_TEMPLATES.get(category, DESC_TEMPLATES["default"])
-    template = random.choice(templates)
 
-    years = random.choice(["2", "3", "5", "7", "10"])
+def generate_description(title, company, city, job_type, *, template, years, tech_area, skills,
+                         passion, responsibility, team, deliverable, requirement, skills_list,
+                         perk, responsibilities, requirements):
+    """Generate a realistic job description.
 
+    Every random choice (template, fill-ins, bullet points, perk) is drawn in
+    bulk by generate_jobs and passed in here by name.
+    """
     desc = template.format(
         title=title,
         company=company,
-        tech_area=random.choice(TECH_AREAS),
-        skills=random.choice(SKILLS_IT if category == "Information Technology" else REQUIREMENTS_GENERAL),
-        passion=random.choice(PASSIONS),
-        responsibility=random.choice(RESPONSIBILITIES),
+        tech_area=tech_area,
+        skills=skills,
+        passion=passion,
+        responsibility=responsibility,
         years=years,
-        team=random.choice(TEAMS),
-        deliverable=random.choice(DELIVERABLES),
+        team=team,
+        deliverable=deliverable,
         action="develop and improve",
         product="core platform",
         domain="software development",
@@ -236,136 +255,192 @@ def generate_description(title, company, category, city, job_type):
         achievement="exceeding quota",
         tools="CRM platforms like Salesforce",
         industry="technology",
-        requirements=random.choice(REQUIREMENTS_GENERAL),
+        requirements=requirement,
         type=job_type,
         location=city,
     )
 
-    # Build HTML description with requirements section
-    requirements = random.sample(REQUIREMENTS_GENERAL, min(3, len(REQUIREMENTS_GENERAL)))
-    skills_list = random.choice(SKILLS_IT if category == "Information Technology" else [REQUIREMENTS_GENERAL[0]])
-
-    html = f"""<p>{desc}</p>
-<h3>Responsibilities</h3>
-<ul>
-{"".join(f"<li>{r}</li>" for r in random.sample(RESPONSIBILITIES, min(4, len(RESPONSIBILITIES))))}
-</ul>
-<h3>Requirements</h3>
-<ul>
-<li>{years}+ years of relevant experience</li>
-{"".join(f"<li>{r}</li>" for r in requirements)}
-<li>Experience with {skills_list}</li>
-</ul>
-<h3>Benefits</h3>
-<ul>
-<li>Competitive salary and equity</li>
-<li>Health, dental, and vision insurance</li>
-<li>Flexible work arrangements</li>
-<li>Professional development budget</li>
-<li>{'Remote work options' if random.random() > 0.5 else 'Generous PTO'}</li>
-</ul>"""
-    return html
+    # Build HTML description with requirements section, in one join over the
+    # pieces instead of nested f-strings and generator joins
+    return ''.join([
+        '<p>', desc, '</p>\n<h3>Responsibilities</h3>\n<ul>\n',
+        *[f'<li>{r}</li>' for r in responsibilities],
+        '\n</ul>\n<h3>Requirements</h3>\n<ul>\n<li>', years, '+ years of relevant experience</li>\n',
+        *[f'<li>{r}</li>' for r in requirements],
+        '\n<li>Experience with ', skills_list, '</li>\n</ul>\n', BENEFITS_HTML, perk, '</li>\n</ul>',
+    ])
 
 
-def generate_jobs(n=1000):
-    """Generate n realistic job records."""
-    jobs = []
-    job_id = 0
+def generate_jobs(n=1000, rng=None):
+    """Generate n realistic job records as a dict of column lists."""
+    if rng is None:
+        rng = np.random.default_rng()
 
+    counts = []
     for category, count in CATEGORIES:
-        actual_count = min(count, n - len(jobs))
+        actual_count = min(count, n - sum(counts))
         if actual_count <= 0:
             break
+        counts.append(actual_count)
+    total = sum(counts)
+
+    # Draw every attribute for the whole batch up front; only the description
+    # text is still assembled row by row
+    categories, titles, templates, skills, skills_lists = [], [], [], [], []
+    for (category, _), count in zip(CATEGORIES, counts):
+        pool = TITLES_BY_CATEGORY.get(category, TITLES_BY_CATEGORY["Other"])
+        categories.extend([category] * count)
+        titles.extend(rng.choice(pool, size=count).tolist())
+        # Description template and skills pools depend on the category
+        is_it = category == "Information Technology"
+        category_templates = DESC_TEMPLATES.get(category, DESC_TEMPLATES["default"])
+        templates.extend(rng.choice(category_templates, size=count).tolist())
+        skills.extend(rng.choice(SKILLS_IT if is_it else REQUIREMENTS_GENERAL, size=count).tolist())
+        if is_it:
+            skills_lists.extend(rng.choice(SKILLS_IT, size=count).tolist())
+        else:
+            skills_lists.extend([REQUIREMENTS_GENERAL[0]] * count)
+
+    # Occasionally add seniority prefix
+    prefixes = rng.choice(TITLE_PREFIXES, size=total).tolist()
+    has_prefix = rng.random(total) > 0.7
+    titles = [prefix + title if add else title for title, prefix, add in zip(titles, prefixes, has_prefix)]
+
+    companies = rng.choice(COMPANIES, size=total).tolist()
+    locations = [CITIES[i] for i in rng.integers(len(CITIES), size=total)]
+    cities = [city for city, _, _ in locations]
+    states = [state for _, state, _ in locations]
+    countries = [country for _, _, country in locations]
+    remote = (rng.random(total) > 0.7).tolist()
+    job_types = rng.choice(JOB_TYPES, size=total, p=np.array([60, 10, 15, 5, 10]) / 100).tolist()
+    experiences = rng.choice(EXPERIENCE_LEVELS, size=total, p=np.array([20, 15, 40, 15, 10]) / 100).tolist()
+    educations = rng.choice(
+        EDUCATION_LEVELS + [""], size=total, p=np.array([10, 10, 40, 20, 10, 10]) / 100,
+    ).tolist()
+
+    # Distinct bullet points per job: ranking one random key per pool entry and
+    # keeping the first k samples without replacement for the whole batch at once
+    n_resps = min(4, len(RESPONSIBILITIES))
+    n_reqs = min(3, len(REQUIREMENTS_GENERAL))
+    resp_picks = rng.random((total, len(RESPONSIBILITIES))).argsort(axis=1)[:, :n_resps].tolist()
+    req_picks = rng.random((total, len(REQUIREMENTS_GENERAL))).argsort(axis=1)[:, :n_reqs].tolist()
+
+    years = rng.choice(["2", "3", "5", "7", "10"], size=total).tolist()
+    tech_areas = rng.choice(TECH_AREAS, size=total).tolist()
+    passions = rng.choice(PASSIONS, size=total).tolist()
+    responsibilities = rng.choice(RESPONSIBILITIES, size=total).tolist()
+    teams = rng.choice(TEAMS, size=total).tolist()
+    deliverables = rng.choice(DELIVERABLES, size=total).tolist()
+    requirements = rng.choice(REQUIREMENTS_GENERAL, size=total).tolist()
+    perks = np.where(rng.random(total) > 0.5, 'Remote work options', 'Generous PTO').tolist()
+
+    ids = [f"{job_id:010X}" for job_id in range(1, total + 1)]
+    columns = {
+        'id': ids,
+        'title': titles,
+        'company': companies,
+        'city': cities,
+        'state': states,
+        'country': countries,
+        'remote': remote,
+        'description': [
+            generate_description(
+                titles[i], companies[i], cities[i], job_types[i],
+                template=templates[i], years=years[i], tech_area=tech_areas[i], skills=skills[i],
+                passion=passions[i], responsibility=responsibilities[i], team=teams[i],
+                deliverable=deliverables[i], requirement=requirements[i],
+                skills_list=skills_lists[i], perk=perks[i],
+                responsibilities=[RESPONSIBILITIES[j] for j in resp_picks[i]],
+                requirements=[REQUIREMENTS_GENERAL[j] for j in req_picks[i]],
+            )
+            for i in range(total)
+        ],
+        'education': educations,
+        'job_type': job_types,
+        'category': categories,
+        'experience': experiences,
+        'url': [f'https://apply.workable.com/j/{ref}' for ref in ids],
+    }
 
-        titles = TITLES_BY_CATEGORY.get(category, TITLES_BY_CATEGORY["Other"])
-
-        for _ in range(actual_count):
-            title = random.choice(titles)
-            # Occasionally add seniority prefix or location suffix
-            if random.random() > 0.7:
-                prefix = random.choice(["Senior ", "Junior ", "Lead ", "Staff ", "Principal "])
-                title = prefix + title
-            company = random.choice(COMPANIES)
-            city, state, country = random.choice(CITIES)
-            remote = random.random() > 0.7
-            job_type = random.choices(JOB_TYPES, weights=[60, 10, 15, 5, 10])[0]
-            experience = random.choices(
-                EXPERIENCE_LEVELS,
-                weights=[20, 15, 40, 15, 10]
-            )[0]
-            education = random.choices(
-                EDUCATION_LEVELS + [""],
-                weights=[10, 10, 40, 20, 10, 10]
-            )[0]
-
-            job_id += 1
-            ref = f"{job_id:010X}"
-
-            jobs.append({
-                'id': ref,
-                'title': title,
-                'company': company,
-                'city': city,
-                'state': state,
-                'country': country,
-                'remote': remote,
-                'description': generate_description(title, company, category, city, job_type),
-                'education': education,
-                'job_type': job_type,
-                'category': category,
-                'experience': experience,
-                'url': f'https://apply.workable.com/j/{ref}',
-            })
-
-    random.shuffle(jobs)
-    return jobs[:n]
+    # Shuffle row order once, applying the same permutation to every column
+    order = rng.permutation(total)[:n]
+    return {col: [values[i] for i in order] for col, values in columns.items()}
 
 
 def clean_html(raw_html):
-    """Simple HTML to text."""
-    if not raw_html:
-        return ''
-    text = re.sub(r'<[^>]+>', ' ', raw_html)
-    text = re.sub(r'&\w+;', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    """Simple HTML to text over a whole Series of descriptions."""
+    return (
+        raw_html.fillna('')
+        .str.replace(MARKUP_RE, ' ', regex=True)
+        .str.replace(WHITESPACE_RE, ' ', regex=True)
+        .str.strip()
+    )
 
 
 def preprocess_text(text):
-    if not text:
-        return ''
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-
-def get_top_n_recs(sim_matrix, df, n=3):
-    recs = {}
-    for i in range(len(df)):
-        scores = sim_matrix[i].copy()
-        scores[i] = -1
-        top_n = np.argsort(scores)[::-1][:n]
-        recs[df.iloc[i]['id']] = [
-            {'id': df.iloc[top_n[j]]['id'], 'score': round(float(scores[top_n[j]]), 4)}
-            for j in range(n)
+    return (
+        text.fillna('')
+        .str.lower()
+        .str.replace(NON_ALNUM_RE, ' ', regex=True)
+        .str.replace(WHITESPACE_RE, ' ', regex=True)
+        .str.strip()
+    )
+
+
+def category_codes(values):
+    return pd.Categorical(values).codes.astype(np.int32)
+
+
+def top_n_indices(sim_block, n_rows, n=3, block_rows=SIM_BLOCK_ROWS):
+    """Top-N neighbour rows per job, scoring `block_rows` source jobs at a time.
+
+    `sim_block(start, stop)` returns the similarity of jobs start:stop against
+    every job, so peak memory is block_rows x N instead of a full N x N matrix.
+    Returns (n_rows, n) arrays of neighbour row indices and their scores, best first.
+    """
+    top_idx = np.empty((n_rows, n), dtype=np.intp)
+    top_val = np.empty((n_rows, n), dtype=np.float32)
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        # Row-wise selection below wants row-major float32; a no-op when already so
+        block = np.ascontiguousarray(sim_block(start, stop), dtype=np.float32)
+        # Exclude self-matches; each block is a fresh array, so writing to it is safe
+        block[np.arange(stop - start), np.arange(start, stop)] = -1
+
+        # Partial top-n selection per row, then sort only those n candidates
+        top_n = np.argpartition(block, -n, axis=1)[:, -n:]
+        top_scores = np.take_along_axis(block, top_n, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_idx[start:stop] = np.take_along_axis(top_n, order, axis=1)
+        top_val[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return top_idx, top_val
+
+
+def recs_to_dict(top_idx, top_scores, ids):
+    """Export layout {job_id: [{'id': rec_id, 'score': score}, ...]} for top_n_indices output."""
+    # Convert to Python objects in one go rather than boxing every numpy scalar
+    # separately inside the dict-building loop
+    rows = zip(ids.tolist(), ids[top_idx].tolist(), top_scores.tolist())
+    return {
+        job_id: [
+            {'id': rec_id, 'score': round(score, 4)}
+            for rec_id, score in zip(rec_ids, rec_scores)
         ]
-    return recs
+        for job_id, rec_ids, rec_scores in rows
+    }
 
 
 def main():
     print(f'Generating {SAMPLE_SIZE} sample jobs...')
-    random.seed(42)
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
 
-    jobs = generate_jobs(SAMPLE_SIZE)
-    df = pd.DataFrame(jobs)
+    df = pd.DataFrame(generate_jobs(SAMPLE_SIZE, rng))
     print(f'Generated {len(df)} jobs across {df["category"].nunique()} categories')
 
     # Clean and preprocess
-    df['description_clean'] = df['description'].apply(clean_html)
-    df['title_clean'] = df['title'].apply(preprocess_text)
-    df['desc_processed'] = df['description_clean'].apply(preprocess_text)
+    df['description_clean'] = clean_html(df['description'])
+    df['title_clean'] = preprocess_text(df['title'])
+    df['desc_processed'] = preprocess_text(df['description_clean'])
 
     # Fill empties
     df['category'] = df['category'].replace('', 'Other')
@@ -378,15 +453,21 @@ def main():
 
     # === BASELINE MODEL ===
     print('\n--- Baseline Model (Title-Only Cosine Similarity) ---')
+    # norm='l2' (the default, spelled out) makes every row unit length, so a
+    # plain dot product via linear_kernel is the cosine similarity
     title_vectorizer = TfidfVectorizer(
         ngram_range=(1, 2), max_features=5000,
         stop_words='english', sublinear_tf=True,
+        norm='l2', dtype=np.float32,
     )
     title_tfidf = title_vectorizer.fit_transform(df['title_clean'])
     print(f'Title TF-IDF shape: {title_tfidf.shape}')
 
-    title_sim_matrix = cosine_similarity(title_tfidf)
-    baseline_recs = get_top_n_recs(title_sim_matrix, df, n=TOP_N)
+    def title_sim_block(start, stop):
+        return linear_kernel(title_tfidf[start:stop], title_tfidf)
+
+    baseline_top, baseline_scores = top_n_indices(title_sim_block, len(df), n=TOP_N)
+    baseline_recs = recs_to_dict(baseline_top, baseline_scores, df['id'].values)
     print(f'Baseline recs: {len(baseline_recs)} jobs')
 
     # === ENHANCED MODEL ===
@@ -395,56 +476,86 @@ def main():
         ngram_range=(1, 2), max_features=10000,
         max_df=0.85, min_df=2,
         stop_words='english', sublinear_tf=True,
-        dtype=np.float32,
+        norm='l2', dtype=np.float32,
     )
     desc_tfidf = desc_vectorizer.fit_transform(df['desc_processed'])
     print(f'Description TF-IDF shape: {desc_tfidf.shape}')
 
-    desc_sim = cosine_similarity(desc_tfidf)
-
-    categories = df['category'].values
-    cat_sim = (categories[:, None] == categories[None, :]).astype(np.float32)
-
-    cities = df['city'].values
-    states = df['state'].values
-    countries = df['country'].values
-    loc_sim = np.where(
-        cities[:, None] == cities[None, :], 1.0,
-        np.where(states[:, None] == states[None, :], 0.5,
-                 np.where(countries[:, None] == countries[None, :], 0.2, 0.0))
-    ).astype(np.float32)
-
-    jobtypes = df['job_type'].values
-    type_sim = (jobtypes[:, None] == jobtypes[None, :]).astype(np.float32)
+    # Dictionary-encode the categorical columns once so the equality tests
+    # compare integers instead of Python strings
+    cat_codes = category_codes(df['category'])
+    city_codes = category_codes(df['city'])
+    state_codes = category_codes(df['state'])
+    country_codes = category_codes(df['country'])
+    type_codes = category_codes(df['job_type'])
 
     exp_map = {
         'Entry level': 0, 'Internship': 0, 'Associate': 1,
         'Mid-Senior level': 2, 'Not Specified': 2,
         'Director': 3, 'Executive': 4,
     }
-    exp_vals = np.array([exp_map.get(e, 2) for e in df['experience'].values], dtype=np.float32)
-    exp_dist = np.abs(exp_vals[:, None] - exp_vals[None, :])
-    max_dist = exp_dist.max()
-    exp_sim = (1.0 - exp_dist / max_dist).astype(np.float32) if max_dist > 0 else np.ones_like(exp_dist)
+    exp_levels = np.array([exp_map.get(e, 2) for e in df['experience'].values], dtype=np.int32)
+    max_dist = exp_levels.max() - exp_levels.min()
 
     WEIGHTS = {
         'description': 0.35, 'title': 0.25, 'category': 0.15,
         'location': 0.10, 'job_type': 0.08, 'experience': 0.07,
     }
 
-    weighted_sim = (
-        WEIGHTS['description'] * desc_sim +
-        WEIGHTS['title'] * title_sim_matrix.astype(np.float32) +
-        WEIGHTS['category'] * cat_sim +
-        WEIGHTS['location'] * loc_sim +
-        WEIGHTS['job_type'] * type_sim +
-        WEIGHTS['experience'] * exp_sim
+    # Category, job type and experience only take a handful of values, so score
+    # every distinct (category, job type, experience) profile against every other
+    # once; each block then needs a single gather instead of three features
+    profiles, profile_ids = np.unique(
+        np.stack([cat_codes, type_codes, exp_levels], axis=1), axis=0, return_inverse=True,
     )
-
-    weighted_recs = get_top_n_recs(weighted_sim, df, n=TOP_N)
+    profile_ids = profile_ids.ravel()
+    p_cat, p_type, p_exp = profiles.T
+    exp_dist = np.abs(p_exp[:, None] - p_exp[None, :])
+    exp_sim = 1.0 - exp_dist / max_dist if max_dist > 0 else np.ones(exp_dist.shape)
+    profile_sim = (
+        WEIGHTS['category'] * (p_cat[:, None] == p_cat[None, :]) +
+        WEIGHTS['job_type'] * (p_type[:, None] == p_type[None, :]) +
+        WEIGHTS['experience'] * exp_sim
+    ).astype(np.float32)
+    print(f'Categorical profiles: {len(profiles)}')
+
+    # Scaling each TF-IDF block by sqrt(weight) and stacking them side by side makes
+    # one dot product equal w_desc * desc_sim + w_title * title_sim
+    text_features = sparse.hstack([
+        desc_tfidf * np.sqrt(WEIGHTS['description']),
+        title_tfidf * np.sqrt(WEIGHTS['title']),
+    ], format='csr', dtype=np.float32)
+
+    def weighted_sim_block(start, stop):
+        rows = slice(start, stop)
+        weighted_sim = linear_kernel(text_features[rows], text_features)
+
+        # Accumulate the remaining features into the same float32 buffer, reusing
+        # a single scratch array rather than allocating a temporary per term
+        tmp = np.empty_like(weighted_sim)
+
+        # Tiered location: same city=1.0, else same state=0.5, else same country=0.2
+        tmp.fill(0.0)
+        np.copyto(tmp, 0.2, where=country_codes[rows, None] == country_codes[None, :])
+        np.copyto(tmp, 0.5, where=state_codes[rows, None] == state_codes[None, :])
+        np.copyto(tmp, 1.0, where=city_codes[rows, None] == city_codes[None, :])
+        tmp *= WEIGHTS['location']
+        weighted_sim += tmp
+
+        np.take(profile_sim[profile_ids[rows]], profile_ids, axis=1, out=tmp)
+        weighted_sim += tmp
+
+        return weighted_sim
+
+    weighted_top, weighted_scores = top_n_indices(weighted_sim_block, len(df), n=TOP_N)
+    weighted_recs = recs_to_dict(weighted_top, weighted_scores, df['id'].values)
     print(f'Weighted recs: {len(weighted_recs)} jobs')
 
     # Spot checks
+    # Repeated ids resolve to their first row, like the df[df['id'] == id].iloc[0] lookup did
+    row_by_id = {}
+    for k, job_id in enumerate(df['id'].values):
+        row_by_id.setdefault(job_id, k)
     for i in [0, 50, 200, 500]:
         if i < len(df):
             job = df.iloc[i]
@@ -454,55 +565,42 @@ def main():
             overlap = len(b_ids & w_ids)
             print(f'    Baseline:')
             for rec in baseline_recs[job['id']]:
-                r = df[df['id'] == rec['id']].iloc[0]
+                r = df.iloc[row_by_id[rec['id']]]
                 print(f'      -> {r["title"]} ({r["company"]}, {r["city"]}) score={rec["score"]:.4f}')
             print(f'    Weighted:')
             for rec in weighted_recs[job['id']]:
-                r = df[df['id'] == rec['id']].iloc[0]
+                r = df.iloc[row_by_id[rec['id']]]
                 print(f'      -> {r["title"]} ({r["company"]}, {r["city"]}) score={rec["score"]:.4f}')
             print(f'    Overlap: {overlap}/{TOP_N}')
 
     # Overlap analysis
-    overlaps = []
-    for job_id in baseline_recs:
-        b_ids = {r['id'] for r in baseline_recs[job_id]}
-        w_ids = {r['id'] for r in weighted_recs[job_id]}
-        overlaps.append(len(b_ids & w_ids))
-    overlap_counts = Counter(overlaps)
-    print(f'\nOverall overlap: avg {np.mean(overlaps):.1f} shared recs per job')
+    # Both top-N index arrays are row-aligned, so compare every baseline pick with
+    # every weighted pick for all jobs in one broadcast
+    overlaps = (baseline_top[:, :, None] == weighted_top[:, None, :]).any(axis=2).sum(axis=1)
+    overlap_counts = Counter(overlaps.tolist())
+    print(f'\nOverall overlap: avg {overlaps.mean():.1f} shared recs per job')
     for k, v in sorted(overlap_counts.items()):
         print(f'  {k}/{TOP_N}: {v} jobs ({v / len(df) * 100:.1f}%)')
 
     # === EXPORT ===
     print('\n--- Exporting JSON ---')
-    jobs_export = []
-    for _, row in df.iterrows():
-        jobs_export.append({
-            'id': row['id'],
-            'title': row['title'],
-            'company': row['company'],
-            'city': row['city'],
-            'state': row['state'],
-            'country': row['country'],
-            'remote': bool(row['remote']),
-            'description': row['description'],
-            'category': row['category'],
-            'jobType': row['job_type'],
-            'experience': row['experience'],
-            'education': row['education'] if row['education'] else 'Not Specified',
-            'url': row['url'],
-        })
+    export_cols = [
+        'id', 'title', 'company', 'city', 'state', 'country', 'remote', 'description',
+        'category', 'job_type', 'experience', 'education', 'url',
+    ]
+    export_df = df[export_cols].rename(columns={'job_type': 'jobType'})
+    jobs_export = export_df.to_dict(orient='records')
 
     jobs_path = os.path.join(OUTPUT_DIR, 'jobs.json')
     baseline_path = os.path.join(OUTPUT_DIR, 'recs_baseline.json')
     weighted_path = os.path.join(OUTPUT_DIR, 'recs_weighted.json')
 
-    with open(jobs_path, 'w') as f:
-        json.dump(jobs_export, f, separators=(',', ':'))
-    with open(baseline_path, 'w') as f:
-        json.dump(baseline_recs, f, separators=(',', ':'))
-    with open(weighted_path, 'w') as f:
-        json.dump(weighted_recs, f, separators=(',', ':'))
+    with open(jobs_path, 'wb') as f:
+        f.write(orjson.dumps(jobs_export))
+    with open(baseline_path, 'wb') as f:
+        f.write(orjson.dumps(baseline_recs))
+    with open(weighted_path, 'wb') as f:
+        f.write(orjson.dumps(weighted_recs))
 
     for path in [jobs_path, baseline_path, weighted_path]:
         size_kb = os.path.getsize(path) / 1024
@@ -510,7 +608,7 @@ def main():
         print(f'  {path}: {label}')
 
     # Sanity check
-    job_ids = {j['id'] for j in jobs_export}
+    job_ids = frozenset(j['id'] for j in jobs_export)
     for recs in [baseline_recs, weighted_recs]:
         for job_id, rec_list in recs.items():
             assert job_id in job_ids